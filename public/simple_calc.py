@@ -83,20 +83,233 @@ JSON 接口格式：
     "defender_item": "无"
   }
 }
+
+属性免疫（最终 type_multiplier 为 0，包括 避雷针/漂浮 等特性带来的免疫）时，
+"damage"、"modifiers.final_modifier" 与 "calculation_steps.step4_type" 均为 0；
+"base_damage"、"stats_used" 等其余字段照常给出。
 """
 
 import yaml
 import json
-import math
 import random
 import os
 import sys
 import argparse
+import io
+import hashlib
+import pickle
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Optional, Union
-from dataclasses import dataclass
-
+from bisect import bisect_left
+from dataclasses import MISSING, dataclass, fields
+from functools import lru_cache
+
+try:
+    # 优先使用 libyaml 的 C 实现，解析大文件（pokedex/moves）快数倍
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader
+
+try:
+    # 可选依赖：orjson 的解析/序列化比标准库 json 快数倍，未安装时回退到 json
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 数据文件解析结果的 pickle 缓存目录
+# （缓存键由缓存格式版本、本脚本及各数据文件的路径 + 修改时间生成）
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pokemon_calc')
+_DATA_FILES = ('moves.yaml', 'pokedex.yaml', 'pokemon_natures.yaml',
+               'items_custom.yaml', '进攻特性.yaml', '防守特性.yaml')
+# 缓存格式版本：修改 _load_data 对数据的整理方式（新增/重命名字段等）时递增，使旧缓存失效
+_CACHE_VERSION = 1
+_CACHED_ATTRS = ('moves_data', 'pokemon_data', 'natures_data',
+                 'attacker_items', 'defender_items',
+                 'offensive_abilities', 'defensive_abilities')
+
+# 六项能力的固定顺序
+STAT_ORDER = ('HP', 'Attack', 'Defense', 'Sp. Attack', 'Sp. Defense', 'Speed')
+# 未知性格的倍率（全部为 1.0）
+_NEUTRAL_NATURE = (1.0,) * len(STAT_ORDER)
+
+# 属性相克表 (攻击属性 -> 防守属性 -> 倍率)，未列出的组合为 1 倍
+_TYPE_CHART = {
+    'Normal': {'Rock': 0.5, 'Ghost': 0, 'Steel': 0.5},
+    'Fighting': {'Normal': 2, 'Flying': 0.5, 'Poison': 0.5, 'Rock': 2, 'Bug': 0.5, 'Ghost': 0, 'Steel': 2, 'Psychic': 0.5, 'Ice': 2, 'Dark': 2, 'Fairy': 0.5},
+    'Flying': {'Fighting': 2, 'Rock': 0.5, 'Bug': 2, 'Steel': 0.5, 'Grass': 2, 'Electric': 0.5},
+    'Poison': {'Poison': 0.5, 'Ground': 0.5, 'Rock': 0.5, 'Ghost': 0.5, 'Steel': 0, 'Grass': 2, 'Fairy': 2},
+    'Ground': {'Flying': 0, 'Poison': 2, 'Rock': 2, 'Bug': 0.5, 'Steel': 2, 'Fire': 2, 'Grass': 0.5, 'Electric': 2},
+    'Rock': {'Fighting': 0.5, 'Flying': 2, 'Ground': 0.5, 'Bug': 2, 'Steel': 0.5, 'Fire': 2, 'Ice': 2},
+    'Bug': {'Fighting': 0.5, 'Flying': 0.5, 'Poison': 0.5, 'Ghost': 0.5, 'Steel': 0.5, 'Fire': 0.5, 'Grass': 2, 'Psychic': 2, 'Dark': 2, 'Fairy': 0.5},
+    'Ghost': {'Normal': 0, 'Ghost': 2, 'Psychic': 2, 'Dark': 0.5},
+    'Steel': {'Rock': 2, 'Steel': 0.5, 'Fire': 0.5, 'Water': 0.5, 'Electric': 0.5, 'Ice': 2, 'Fairy': 2},
+    'Fire': {'Rock': 0.5, 'Bug': 2, 'Steel': 2, 'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 2, 'Dragon': 0.5},
+    'Water': {'Ground': 2, 'Rock': 2, 'Fire': 2, 'Water': 0.5, 'Grass': 0.5, 'Dragon': 0.5},
+    'Grass': {'Flying': 0.5, 'Poison': 0.5, 'Ground': 2, 'Rock': 2, 'Bug': 0.5, 'Steel': 0.5, 'Fire': 0.5, 'Water': 2, 'Grass': 0.5, 'Dragon': 0.5},
+    'Electric': {'Flying': 2, 'Ground': 0, 'Water': 2, 'Grass': 0.5, 'Electric': 0.5, 'Dragon': 0.5},
+    'Psychic': {'Fighting': 2, 'Poison': 2, 'Steel': 0.5, 'Psychic': 0.5, 'Dark': 0},
+    'Ice': {'Flying': 2, 'Ground': 2, 'Steel': 0.5, 'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 0.5, 'Dragon': 2},
+    'Dragon': {'Steel': 0.5, 'Dragon': 2, 'Fairy': 0},
+    'Dark': {'Fighting': 0.5, 'Ghost': 2, 'Psychic': 2, 'Dark': 0.5, 'Fairy': 0.5},
+    'Fairy': {'Fighting': 2, 'Poison': 0.5, 'Steel': 0.5, 'Fire': 0.5, 'Dragon': 2, 'Dark': 2}
+}
+# 属性名 -> 整数下标；模块加载时展开为行优先的扁平编码表，查表时只需下标访问。
+# 倍率只有 0 / 0.5 / 1 / 2 四种，按 2 倍取整后编码为一个字节 (0, 1, 2, 4)，
+# 整张表只占 19*18 字节，再经 _CODE_TO_MULT 还原为浮点倍率。
+# 每行末尾追加一列 1 倍作为填充列：未知的防守属性都映射到该列，查表无需分支
+_TYPE_ID = {type_name: i for i, type_name in enumerate(_TYPE_CHART)}
+_TYPE_PAD_ID = len(_TYPE_ID)
+_TYPE_STRIDE = _TYPE_PAD_ID + 1
+_CODE_TO_MULT = tuple(code / 2 for code in range(5))
+_TYPE_CODES = bytes(
+    code
+    for row in _TYPE_CHART.values()
+    for code in [int(row.get(defense_type, 1.0) * 2) for defense_type in _TYPE_ID] + [2]
+)
+# 对外公开的只读属性相克表（攻击属性 -> 防守属性 -> 倍率），仅供查看；
+# 实际计算只查 _TYPE_CODES，因此不提供可修改的副本
+_TYPE_CHART_VIEW = MappingProxyType(
+    {attack_type: MappingProxyType(row) for attack_type, row in _TYPE_CHART.items()}
+)
+
+# 随机因子取值区间 [0.85, 1.0]；直接用 random.random() 做仿射变换，
+# 与 random.uniform(0.85, 1.0) 的公式及结果完全一致，但省去一次函数调用
+_RANDOM_MIN = 0.85
+_RANDOM_SPAN = 1.0 - _RANDOM_MIN
+
+# 伤害区间使用的 16 档随机因子 (0.85 到 1.0)
+_RANDOM_FACTORS = tuple(0.85 + (i / 15) * 0.15 for i in range(16))
+# 命令行输出展示用的 16 档随机因子 (0.85, 0.86, ..., 1.00)
+_DISPLAY_RANDOM_FACTORS = tuple(i / 100.0 for i in range(85, 101))
+
+# 天气对招式属性的伤害修正: (天气, 招式属性) -> 倍率；未列出的组合为 1.0
+_WEATHER_TYPE_MULTIPLIERS = {
+    ('sunny', 'Fire'): 1.5,
+    ('sunny', 'Water'): 0.5,
+    ('rain', 'Water'): 1.5,
+    ('rain', 'Fire'): 0.5,
+}
 
-@dataclass
+# 无畏可以无视属性免疫的招式属性（一般/格斗招式可以打中幽灵）
+_IMMUNITY_BYPASS_TYPES = ('Normal', 'Fighting')
+
+# calculate_damage_batch 的输入列（与 _prepare_modifiers 结果中的同名字段含义一致）
+_BATCH_COLUMNS = ('level', 'power', 'attack_stat', 'defense_stat', 'other_modifiers',
+                  'critical_multiplier', 'stab_multiplier', 'type_multiplier')
+
+# 能力值缓存的最大条目数
+_STATS_CACHE_SIZE = 4096
+
+# Python 3.10+ 的 dataclass 支持 slots=True：实例不再携带 __dict__，属性访问更快、内存更小
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _interned(value):
+    """驻留字符串（非字符串原样返回）"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# ------ 纯整数运算内核（不依赖任何对象，便于复用与单独测试） ------
+
+def _hp_stat(base_value: int, iv: int, ev: int, level: int) -> int:
+    """HP 计算公式: ((Base * 2 + IV + EV/4) * Level / 100) + Level + 10"""
+    return int(((base_value * 2 + iv + ev // 4) * level // 100) + level + 10)
+
+
+def _raw_stat(base_value: int, iv: int, ev: int, level: int) -> int:
+    """其它能力值（未计性格）: ((Base * 2 + IV + EV/4) * Level / 100) + 5"""
+    return int(((base_value * 2 + iv + ev // 4) * level // 100) + 5)
+
+
+def _base_damage(level: int, power: int, attack_stat: int, defense_stat: int) -> int:
+    """乘以各项修正前的基础伤害（逐步整除）"""
+    return ((2 * level) // 5 + 2) * power * attack_stat // defense_stat // 50 + 2
+
+
+def _final_modifier(float_final: float, type_multiplier: float) -> int:
+    """
+    最终整数修正：向下取整并保证至少为 1；
+    属性免疫（最终相克倍率为 0，包括特性带来的免疫）时为 0，伤害随之为 0。
+    """
+    if type_multiplier == 0:
+        return 0
+    # guarded: 各倍率均为非负数，乘积非负，int() 向零截断与 floor 等价
+    return max(1, int(float_final))
+
+
+@lru_cache(maxsize=1024)
+def _roll_modifiers(float_step1: float, stab_multiplier: float, type_multiplier: float,
+                    random_factors: Tuple[float, ...] = _RANDOM_FACTORS) -> Tuple[int, ...]:
+    """
+    各档随机因子下的最终整数修正，规则同 _final_modifier（免疫时全部为 0）。
+    只取决于少量离散的倍率组合，按组合缓存后批量计算时几乎都能命中。
+    """
+    if type_multiplier == 0:
+        return (0,) * len(random_factors)
+    # guarded: 各倍率均为非负数，乘积非负，int() 向零截断与 floor 等价
+    return tuple(max(1, int(float_step1 * random_factor * stab_multiplier * type_multiplier))
+                 for random_factor in random_factors)
+
+
+def _damage_summary(base_damage: int, other_modifiers: float, stab_multiplier: float,
+                    type_multiplier: float, defender_hp: int,
+                    random_factors: Tuple[float, ...] = _DISPLAY_RANDOM_FACTORS) -> Tuple[int, int, int, int, int, int]:
+    """
+    命令行展示用：一次算出非暴击与暴击(显示为 x1.5)两组伤害的统计量。
+    返回 (最小, 最大, 暴击最小, 暴击最大, 一击必杀档数, 暴击一击必杀档数)。
+    随机因子按升序排列且各倍率非负，伤害序列单调不减：最小/最大值即首尾两档，
+    一击必杀档数即为二分查找到的首个 >= defender_hp 位置之后的档数，无需逐项扫描。
+    """
+    damages = [base_damage * final_mod
+               for final_mod in _roll_modifiers(other_modifiers * 1.0, stab_multiplier, type_multiplier, random_factors)]
+    damages_crit = [base_damage * final_mod
+                    for final_mod in _roll_modifiers(other_modifiers * 1.5, stab_multiplier, type_multiplier, random_factors)]
+    return (damages[0], damages[-1], damages_crit[0], damages_crit[-1],
+            len(damages) - bisect_left(damages, defender_hp),
+            len(damages_crit) - bisect_left(damages_crit, defender_hp))
+
+
+@lru_cache(maxsize=4096)
+def _type_effectiveness(attack_type: str, defense_types: Tuple[str, ...]) -> float:
+    """
+    属性相克倍率（查模块级编码表）。
+    攻击属性与防守属性组合只有几千种，按组合缓存后重复查询只需一次字典探测。
+    """
+    attack_id = _TYPE_ID.get(attack_type)
+    if attack_id is None:
+        return 1.0
+
+    # 双属性的乘积自然落在 {0, 0.25, 0.5, 1, 2, 4} 中，无需再做取值归并
+    row_start = attack_id * _TYPE_STRIDE
+    if len(defense_types) == 2:
+        # 最常见的双属性情况直接展开为两次查表相乘
+        first, second = defense_types
+        return (1.0
+                * _CODE_TO_MULT[_TYPE_CODES[row_start + _TYPE_ID.get(first, _TYPE_PAD_ID)]]
+                * _CODE_TO_MULT[_TYPE_CODES[row_start + _TYPE_ID.get(second, _TYPE_PAD_ID)]])
+
+    effectiveness = 1.0
+    for defense_type in defense_types:
+        effectiveness *= _CODE_TO_MULT[_TYPE_CODES[row_start + _TYPE_ID.get(defense_type, _TYPE_PAD_ID)]]
+    return effectiveness
+
+
+def _scale_stats(stats: Dict[str, int], stat_names, multiplier: float) -> Dict[str, int]:
+    """
+    将指定能力值按倍率取整后返回。
+    首次需要修改时才复制 stats；没有可修改的能力时直接返回原字典。
+    """
+    modified_stats = stats
+    for stat_name in stat_names:
+        if stat_name in modified_stats:
+            if modified_stats is stats:
+                modified_stats = stats.copy()
+            modified_stats[stat_name] = int(modified_stats[stat_name] * multiplier)
+    return modified_stats
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Pokemon:
     """宝可梦 数据结构"""
     id: int
@@ -115,8 +328,17 @@ class Pokemon:
     ivs: Dict[str, int] = None
     # 努力值 (EVs) - 每项 0-252, 总和上限 510
     evs: Dict[str, int] = None
+    # 当前 HP（用于 HP% 触发的特性；None 表示未设置）
+    current_hp: Optional[int] = None
     
     def __post_init__(self):
+        # 属性/特性/道具/性格名驻留后与模块级查找表的键是同一对象，
+        # 查表时按身份即可命中，不必逐字节比较中文字符串
+        if isinstance(self.types, list):
+            self.types = [_interned(type_name) for type_name in self.types]
+        self.ability = _interned(self.ability)
+        self.item = _interned(self.item)
+        self.nature = _interned(self.nature)
         if self.screens is None:
             self.screens = []
         if self.ivs is None:
@@ -126,8 +348,27 @@ class Pokemon:
             # 默认无努力值
             self.evs = {"HP": 0, "Attack": 0, "Defense": 0, "Sp. Attack": 0, "Sp. Defense": 0, "Speed": 0}
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Pokemon':
+        """
+        由字典（JSON 接口数据）构建：跳过生成的 __init__，按预先取得的字段表逐个赋值。
+        必填字段缺失时抛出 KeyError，可选字段缺省时取字段默认值，未知键忽略。
+        """
+        pokemon = cls.__new__(cls)
+        for field_name in _POKEMON_REQUIRED_FIELDS:
+            setattr(pokemon, field_name, data[field_name])
+        for field_name, default in _POKEMON_OPTIONAL_FIELDS:
+            setattr(pokemon, field_name, data.get(field_name, default))
+        pokemon.__post_init__()
+        return pokemon
+
+
+# Pokemon.from_dict 使用的字段表，在类定义后一次性取得
+_POKEMON_REQUIRED_FIELDS = tuple(f.name for f in fields(Pokemon) if f.default is MISSING)
+_POKEMON_OPTIONAL_FIELDS = tuple((f.name, f.default) for f in fields(Pokemon) if f.default is not MISSING)
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Move:
     """招式 数据结构"""
     id: int
@@ -145,23 +386,66 @@ class PokemonDamageCalculator:
         self.moves_data = {}
         self.pokemon_data = {}
         self.natures_data = {}
-        self.type_effectiveness = {}
         
         # 道具从 YAML 加载，先初始化为空
         self.attacker_items = {}
         self.defender_items = {}
         
+        # 能力值计算结果缓存：(等级, 性格倍率, 基础值, 个体值, 努力值) -> 能力值
+        self._stats_cache: Dict[tuple, Tuple[int, ...]] = {}
+        # 名称反向索引（按需构建，见 _name_index）
+        self._name_indexes = {}
+        
         # 加载所有数据文件
         if load_data_files:
-            self._load_data()
+            self._load_data_cached()
         self._setup_type_effectiveness()
     
-    def _load_data(self):
-        """加载 YAML/JSON 数据文件"""
+    def _data_cache_path(self) -> str:
+        """根据缓存格式版本、本脚本与数据文件的路径及修改时间计算缓存文件路径"""
+        # 脚本本身的修改时间也参与缓存键：即使忘记递增 _CACHE_VERSION，更新代码后也不会读到旧格式的缓存
+        parts = [f"v{_CACHE_VERSION}".encode('utf-8')]
+        for path in (os.path.abspath(__file__),) + _DATA_FILES:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                mtime = None  # 可选文件缺失也参与缓存键
+            parts.append(f"{os.path.abspath(path)}:{mtime}".encode('utf-8'))
+        key = hashlib.sha1(b''.join(parts)).hexdigest()
+        return os.path.join(_CACHE_DIR, f"{key}.pkl")
+
+    def _load_data_cached(self):
+        """加载数据文件，优先读取 pickle 缓存；未命中时解析 YAML 并写回缓存"""
+        cache_path = self._data_cache_path()
+        try:
+            with open(cache_path, 'rb') as f:
+                self.__dict__.update(pickle.load(f))
+            print("Data loaded successfully!")
+            return
+        except Exception:
+            # 缓存不存在或已损坏，回退到 YAML 解析
+            pass
+
+        if not self._load_data():
+            return
+
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({attr: getattr(self, attr) for attr in _CACHED_ATTRS}, f, protocol=5)
+            # 原子替换，避免并发进程读到写了一半的缓存
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            # 缓存目录不可写时忽略，仅影响下次启动速度
+            pass
+
+    def _load_data(self) -> bool:
+        """加载 YAML/JSON 数据文件，成功返回 True"""
         try:
             # 加载招式数据
             with open('moves.yaml', 'r', encoding='utf-8') as f:
-                moves_list = yaml.safe_load(f)
+                moves_list = yaml.load(f, Loader=_YamlSafeLoader)
                 for move in moves_list:
                     self.moves_data[move['id']] = {
                         'name': move['cname'],
@@ -173,7 +457,7 @@ class PokemonDamageCalculator:
             
             # 加载宝可梦图鉴数据
             with open('pokedex.yaml', 'r', encoding='utf-8') as f:
-                pokemon_list = yaml.safe_load(f)
+                pokemon_list = yaml.load(f, Loader=_YamlSafeLoader)
                 for pokemon in pokemon_list:
                     self.pokemon_data[pokemon['id']] = {
                         'name': pokemon['name']['chinese'],
@@ -184,7 +468,7 @@ class PokemonDamageCalculator:
             
             # 加载性格数据
             with open('pokemon_natures.yaml', 'r', encoding='utf-8') as f:
-                natures_data = yaml.safe_load(f)
+                natures_data = yaml.load(f, Loader=_YamlSafeLoader)
                 for nature in natures_data['natures']:
                     self.natures_data[nature['name']] = {
                         'HP': nature['HP'],
@@ -199,7 +483,7 @@ class PokemonDamageCalculator:
             items_file = 'items_custom.yaml'
             try:
                 with open(items_file, 'r', encoding='utf-8') as f:
-                    items_loaded = yaml.safe_load(f) or {}
+                    items_loaded = yaml.load(f, Loader=_YamlSafeLoader) or {}
                     self.attacker_items = items_loaded.get('attacker_items', {})
                     self.defender_items = items_loaded.get('defender_items', {})
             except Exception:
@@ -209,7 +493,7 @@ class PokemonDamageCalculator:
             # 从 YAML 加载进攻/防守特性（若存在）
             try:
                 with open('进攻特性.yaml', 'r', encoding='utf-8') as f:
-                    off = yaml.safe_load(f) or {}
+                    off = yaml.load(f, Loader=_YamlSafeLoader) or {}
                     # 原始映射: 名称 -> 属性字典
                     self.offensive_abilities = off.get('进攻特性', {}) if isinstance(off, dict) else {}
             except Exception:
@@ -217,66 +501,86 @@ class PokemonDamageCalculator:
             
             try:
                 with open('防守特性.yaml', 'r', encoding='utf-8') as f:
-                    de = yaml.safe_load(f) or {}
+                    de = yaml.load(f, Loader=_YamlSafeLoader) or {}
                     self.defensive_abilities = de.get('防守特性', {}) if isinstance(de, dict) else {}
             except Exception:
                 self.defensive_abilities = {}
             
             print("Data loaded successfully!")
+            return True
             
         except Exception as e:
             print(f"Error loading data: {e}")
+            return False
+    
+    def _name_index(self, kind: str, data: Dict) -> Dict[str, Tuple]:
+        """
+        中文名 -> (id, 数据) 的反向索引；重名时保留第一个，与线性查找的结果一致。
+        数据字典被整体替换或条目数变化（构造后新增/删除条目）时重新构建。
+        """
+        cached = self._name_indexes.get(kind)
+        if cached is None or cached[0] is not data or cached[1] != len(data):
+            index = {}
+            for entry_id, entry in data.items():
+                index.setdefault(entry['name'], (entry_id, entry))
+            cached = self._name_indexes[kind] = (data, len(data), index)
+        return cached[2]
     
     def _setup_type_effectiveness(self):
-        """设置属性相克表"""
+        """设置属性相克表（只读视图，仅供查看；计算使用模块级预计算编码表）"""
         # 属性相克矩阵 (攻击属性 -> 防守属性 -> 倍率)
-        self.type_effectiveness = {
-            'Normal': {'Rock': 0.5, 'Ghost': 0, 'Steel': 0.5},
-            'Fighting': {'Normal': 2, 'Flying': 0.5, 'Poison': 0.5, 'Rock': 2, 'Bug': 0.5, 'Ghost': 0, 'Steel': 2, 'Psychic': 0.5, 'Ice': 2, 'Dark': 2, 'Fairy': 0.5},
-            'Flying': {'Fighting': 2, 'Rock': 0.5, 'Bug': 2, 'Steel': 0.5, 'Grass': 2, 'Electric': 0.5},
-            'Poison': {'Poison': 0.5, 'Ground': 0.5, 'Rock': 0.5, 'Ghost': 0.5, 'Steel': 0, 'Grass': 2, 'Fairy': 2},
-            'Ground': {'Flying': 0, 'Poison': 2, 'Rock': 2, 'Bug': 0.5, 'Steel': 2, 'Fire': 2, 'Grass': 0.5, 'Electric': 2},
-            'Rock': {'Fighting': 0.5, 'Flying': 2, 'Ground': 0.5, 'Bug': 2, 'Steel': 0.5, 'Fire': 2, 'Ice': 2},
-            'Bug': {'Fighting': 0.5, 'Flying': 0.5, 'Poison': 0.5, 'Ghost': 0.5, 'Steel': 0.5, 'Fire': 0.5, 'Grass': 2, 'Psychic': 2, 'Dark': 2, 'Fairy': 0.5},
-            'Ghost': {'Normal': 0, 'Ghost': 2, 'Psychic': 2, 'Dark': 0.5},
-            'Steel': {'Rock': 2, 'Steel': 0.5, 'Fire': 0.5, 'Water': 0.5, 'Electric': 0.5, 'Ice': 2, 'Fairy': 2},
-            'Fire': {'Rock': 0.5, 'Bug': 2, 'Steel': 2, 'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 2, 'Dragon': 0.5},
-            'Water': {'Ground': 2, 'Rock': 2, 'Fire': 2, 'Water': 0.5, 'Grass': 0.5, 'Dragon': 0.5},
-            'Grass': {'Flying': 0.5, 'Poison': 0.5, 'Ground': 2, 'Rock': 2, 'Bug': 0.5, 'Steel': 0.5, 'Fire': 0.5, 'Water': 2, 'Grass': 0.5, 'Dragon': 0.5},
-            'Electric': {'Flying': 2, 'Ground': 0, 'Water': 2, 'Grass': 0.5, 'Electric': 0.5, 'Dragon': 0.5},
-            'Psychic': {'Fighting': 2, 'Poison': 2, 'Steel': 0.5, 'Psychic': 0.5, 'Dark': 0},
-            'Ice': {'Flying': 2, 'Ground': 2, 'Steel': 0.5, 'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 0.5, 'Dragon': 2},
-            'Dragon': {'Steel': 0.5, 'Dragon': 2, 'Fairy': 0},
-            'Dark': {'Fighting': 0.5, 'Ghost': 2, 'Psychic': 2, 'Dark': 0.5, 'Fairy': 0.5},
-            'Fairy': {'Fighting': 2, 'Poison': 0.5, 'Steel': 0.5, 'Fire': 0.5, 'Dragon': 2, 'Dark': 2}
-        }
+        self.type_effectiveness = _TYPE_CHART_VIEW
     
     def get_type_effectiveness(self, attack_type: str, defense_types: List[str]) -> float:
         """计算属性相克倍率"""
-        if attack_type not in self.type_effectiveness:
-            return 1.0
+        return _type_effectiveness(attack_type, tuple(defense_types))
+    
+    def calculate_stats(self, pokemon: Pokemon) -> Dict[str, int]:
+        """根据基础值、等级、性格、IV/EV 计算实际能力值（每次返回新的字典，可自由修改）"""
+        values = self._stats_values(pokemon)
+        if values is None:
+            # 基础值缺项或含额外键时，按原始的逐键方式计算
+            return self._calculate_stats_by_name(pokemon)
+        return dict(zip(STAT_ORDER, values))
+    
+    def _stats_values(self, pokemon: Pokemon) -> Optional[Tuple[int, ...]]:
+        """
+        按 STAT_ORDER 排列的六项能力值元组，结果按输入缓存。
+        缓存中只保存不可变的元组，调用方无法改动缓存内容；
+        基础值不是标准六项时返回 None。
+        """
+        base_stats = pokemon.base_stats
+        base_values = tuple(map(base_stats.get, STAT_ORDER))
+        if len(base_stats) != len(STAT_ORDER) or None in base_values:
+            return None
         
-        effectiveness = 1.0
-        for defense_type in defense_types:
-            if defense_type in self.type_effectiveness[attack_type]:
-                effectiveness *= self.type_effectiveness[attack_type][defense_type]
-            else:
-                effectiveness *= 1.0
+        level = pokemon.level
+        ivs = tuple(31 if iv is None else iv for iv in map(pokemon.ivs.get, STAT_ORDER))  # 默认 31
+        evs = tuple(0 if ev is None else ev for ev in map(pokemon.evs.get, STAT_ORDER))   # 默认 0
+        # 性格倍率每次从 natures_data 读取（构造后修改性格表也会生效），
+        # 缓存键使用倍率本身而不是性格名，性格表变化后不会命中旧结果
+        nature_modifiers = self.natures_data.get(pokemon.nature)
+        nature_multipliers = (_NEUTRAL_NATURE if nature_modifiers is None
+                              else tuple(map(nature_modifiers.get, STAT_ORDER, _NEUTRAL_NATURE)))
+        cache_key = (level, nature_multipliers, base_values, ivs, evs)
+        cached = self._stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        # 处理双重抗性/弱点
-        if effectiveness == 0.25:
-            return 0.25
-        elif effectiveness == 4.0:
-            return 4.0
-        elif effectiveness == 0.5:
-            return 0.5
-        elif effectiveness == 2.0:
-            return 2.0
-        else:
-            return 1.0
+        # 应用性格倍率（HP 不受性格影响）
+        values = (_hp_stat(base_values[0], ivs[0], evs[0], level),) + tuple(
+            int(_raw_stat(base_values[i], ivs[i], evs[i], level) * nature_multipliers[i])
+            for i in range(1, len(STAT_ORDER))
+        )
+        
+        # 长时间运行时避免缓存无限增长
+        if len(self._stats_cache) >= _STATS_CACHE_SIZE:
+            self._stats_cache.clear()
+        self._stats_cache[cache_key] = values
+        return values
     
-    def calculate_stats(self, pokemon: Pokemon) -> Dict[str, int]:
-        """根据基础值、等级、性格、IV/EV 计算实际能力值"""
+    def _calculate_stats_by_name(self, pokemon: Pokemon) -> Dict[str, int]:
+        """按 base_stats 中实际存在的键逐项计算能力值（非标准输入的回退路径）"""
         stats = {}
         
         for stat_name, base_value in pokemon.base_stats.items():
@@ -284,11 +588,9 @@ class PokemonDamageCalculator:
             ev = pokemon.evs.get(stat_name, 0)   # 默认 0
             
             if stat_name == 'HP':
-                # HP 计算公式: ((Base * 2 + IV + EV/4) * Level / 100) + Level + 10
-                stats[stat_name] = int(((base_value * 2 + iv + ev // 4) * pokemon.level // 100) + pokemon.level + 10)
+                stats[stat_name] = _hp_stat(base_value, iv, ev, pokemon.level)
             else:
-                # 其它能力值: ((Base * 2 + IV + EV/4) * Level / 100) + 5
-                base_stat = int(((base_value * 2 + iv + ev // 4) * pokemon.level // 100) + 5)
+                base_stat = _raw_stat(base_value, iv, ev, pokemon.level)
                 
                 # 应用性格倍率
                 nature_multiplier = 1.0
@@ -301,7 +603,8 @@ class PokemonDamageCalculator:
     
     def _round_half_up(self, value: float) -> int:
         """正数的五舍六入 (round half up)"""
-        return int(math.floor(value + 0.5))
+        # 输入恒为非负数，int() 向零截断与 floor 等价，省去 math.floor 调用
+        return int(value + 0.5)
 
     def calculate_damage_from_json(self, json_data: Dict) -> Dict[str, Union[int, float]]:
         """
@@ -316,39 +619,8 @@ class PokemonDamageCalculator:
             random_factor = json_data.get('random_factor', None)
             
             # 创建 Pokemon 对象
-            attacker = Pokemon(
-                id=attacker_data['id'],
-                name=attacker_data['name'],
-                types=attacker_data['types'],
-                base_stats=attacker_data['base_stats'],
-                level=attacker_data.get('level', 50),
-                nature=attacker_data.get('nature', '勤奋'),
-                ability=attacker_data.get('ability', ''),
-                item=attacker_data.get('item', ''),
-                status=attacker_data.get('status', ''),
-                weather=attacker_data.get('weather', ''),
-                screens=attacker_data.get('screens', []),
-                assist_status=attacker_data.get('assist_status', ''),
-                ivs=attacker_data.get('ivs', {}),
-                evs=attacker_data.get('evs', {})
-            )
-            
-            defender = Pokemon(
-                id=defender_data['id'],
-                name=defender_data['name'],
-                types=defender_data['types'],
-                base_stats=defender_data['base_stats'],
-                level=defender_data.get('level', 50),
-                nature=defender_data.get('nature', '勤奋'),
-                ability=defender_data.get('ability', ''),
-                item=defender_data.get('item', ''),
-                status=defender_data.get('status', ''),
-                weather=defender_data.get('weather', ''),
-                screens=defender_data.get('screens', []),
-                assist_status=defender_data.get('assist_status', ''),
-                ivs=defender_data.get('ivs', {}),
-                evs=defender_data.get('evs', {})
-            )
+            attacker = Pokemon.from_dict(attacker_data)
+            defender = Pokemon.from_dict(defender_data)
             
             # 直接使用传入的招式数据
             move = move_data
@@ -365,145 +637,166 @@ class PokemonDamageCalculator:
         直接使用传入的招式数据计算伤害 - 不依赖本地数据文件
         """
         try:
-            # 计算能力值（道具可能会修改数值，稍后再应用）
-            attacker_stats = self.calculate_stats(attacker)
-            defender_stats = self.calculate_stats(defender)
-
-            # 应用进攻/防守道具效果（可能修改数值或返回伤害倍率）
-            type_multiplier = self.get_type_effectiveness(move['type'], defender.types)
-            attacker_item_result = self.apply_attacker_item_effects(attacker, attacker_stats, move['type'], type_multiplier)
-            attacker_stats = attacker_item_result['stats']
-            attacker_damage_multiplier = attacker_item_result['damage_multiplier']
+            prepared = self._prepare_modifiers(attacker, defender, move, critical_hit)
+            return self._finalize(attacker, defender, prepared, random_factor)
+        except Exception as e:
+            return {'error': f'Calculation error: {str(e)}'}
 
-            defender_item_result = self.apply_defender_item_effects(defender, defender_stats)
-            defender_stats = defender_item_result['stats']
-            defender_damage_multiplier = defender_item_result['damage_multiplier']
+    def _prepare_modifiers(self, attacker: Pokemon, defender: Pokemon, move: Dict,
+                           critical_hit: bool) -> Dict[str, Union[int, float]]:
+        """
+        计算与随机因子无关的部分：能力值、道具、特性、基础伤害及各项倍率。
+        结果可在多个随机因子之间复用。
+        """
+        # 招式属性在整个计算中多次使用，只取一次
+        move_type = move['type']
+        type_multiplier = self.get_type_effectiveness(move_type, defender.types)
+
+        # 计算能力值（道具可能会修改数值，稍后再应用）
+        attacker_stats = self.calculate_stats(attacker)
+        defender_stats = self.calculate_stats(defender)
+
+        # 应用进攻/防守道具效果（可能修改数值或返回伤害倍率）
+        attacker_item_result = self.apply_attacker_item_effects(attacker, attacker_stats, move_type, type_multiplier)
+        attacker_stats = attacker_item_result['stats']
+        attacker_damage_multiplier = attacker_item_result['damage_multiplier']
+
+        defender_item_result = self.apply_defender_item_effects(defender, defender_stats)
+        defender_stats = defender_item_result['stats']
+        defender_damage_multiplier = defender_item_result['damage_multiplier']
+
+        # 根据招式分类选择使用的攻防数值
+        category = move['category']
+        if category == '物理':
+            attack_stat = attacker_stats.get('Attack', 1)
+            defense_stat = defender_stats.get('Defense', 1)
+        else:
+            attack_stat = attacker_stats.get('Sp. Attack', 1)
+            defense_stat = defender_stats.get('Sp. Defense', 1)
+
+        # 对防守方的墙壁效果应用到防御数值（若存在）
+        # reflect 影响物防，light_screen 影响特防
+        if defender.screens:
+            if 'reflect' in defender.screens and category == '物理':
+                defense_stat = int(defense_stat * 1.5)
+            if 'light_screen' in defender.screens and category != '物理':
+                defense_stat = int(defense_stat * 1.5)
+
+        # 防止除以零
+        if defense_stat <= 0:
+            defense_stat = 1
+
+        # 基础伤害部分（按常见整数运算）
+        power = move.get('power', 0)
+        # 确保power不为None，如果为None则设为0
+        if power is None:
+            power = 0
+        base_damage = _base_damage(attacker.level, power, attack_stat, defense_stat)  # 这是乘以修正前的基础伤害
+
+        # ------ 处理能力（特性）/状态/天气/道具 等对其他修正的影响 ------
+        other_modifiers = 1.0
+
+        # 灼烧会使物理攻击减半（毅力/ Guts 特性例外在特性处理中处理）
+        if attacker.status == 'burn' and category == '物理' and attacker.ability != '毅力':
+            other_modifiers *= 0.5
+
+        # 天气影响（以攻击方/防守方任一方的 weather 字段为准）
+        weather = attacker.weather or defender.weather or ""
+        other_modifiers *= _WEATHER_TYPE_MULTIPLIERS.get((weather, move_type), 1.0)
+
+        # 帮助类效果
+        if attacker.assist_status == 'help':
+            other_modifiers *= 1.5
+
+        # 包含道具带来的伤害倍率
+        other_modifiers *= attacker_damage_multiplier
+        other_modifiers *= defender_damage_multiplier
+
+        # 初始暴击 & STAB 倍率
+        critical_multiplier = 2.0 if critical_hit else 1.0
+        stab_multiplier = 1.5 if move_type in attacker.types else 1.0
+
+        # 让特性修改 other_modifiers / STAB / 暴击倍率 / 属性相克倍率
+        other_modifiers, stab_multiplier, critical_multiplier, type_multiplier = \
+            self.apply_offensive_ability_effects(attacker, move, other_modifiers,
+                                                 stab_multiplier, critical_multiplier,
+                                                 type_multiplier, critical_hit)
+
+        other_modifiers, type_multiplier = self.apply_defensive_ability_effects(defender, move_type,
+                                                                                category,
+                                                                                other_modifiers,
+                                                                                type_multiplier)
 
-            # 根据招式分类选择使用的攻防数值
-            if move['category'] == '物理':
-                attack_stat = attacker_stats.get('Attack', 1)
-                defense_stat = defender_stats.get('Defense', 1)
-            else:
-                attack_stat = attacker_stats.get('Sp. Attack', 1)
-                defense_stat = defender_stats.get('Sp. Defense', 1)
-
-            # 对防守方的墙壁效果应用到防御数值（若存在）
-            # reflect 影响物防，light_screen 影响特防
-            if defender.screens:
-                if 'reflect' in defender.screens and move['category'] == '物理':
-                    defense_stat = int(defense_stat * 1.5)
-                if 'light_screen' in defender.screens and move['category'] != '物理':
-                    defense_stat = int(defense_stat * 1.5)
-
-            # 防止除以零
-            if defense_stat <= 0:
-                defense_stat = 1
-
-            # 基础伤害部分（按常见整数运算）
-            level = attacker.level
-            power = move.get('power', 0)
-            # 确保power不为None，如果为None则设为0
-            if power is None:
-                power = 0
-            base_numerator = ((2 * level) // 5 + 2) * power * attack_stat
-            base_div = base_numerator // defense_stat
-            base_damage = base_div // 50 + 2  # 这是乘以修正前的基础伤害
-
-            # ------ 处理能力（特性）/状态/天气/道具 等对其他修正的影响 ------
-            other_modifiers = 1.0
-
-            # 灼烧会使物理攻击减半（毅力/ Guts 特性例外在特性处理中处理）
-            if attacker.status == 'burn' and move['category'] == '物理' and attacker.ability != '毅力':
-                other_modifiers *= 0.5
-
-            # 天气影响（以攻击方/防守方任一方的 weather 字段为准）
-            weather = attacker.weather or defender.weather or ""
-            if weather == 'sunny' and move['type'] == 'Fire':
-                other_modifiers *= 1.5
-            elif weather == 'sunny' and move['type'] == 'Water':
-                other_modifiers *= 0.5
-            elif weather == 'rain' and move['type'] == 'Water':
-                other_modifiers *= 1.5
-            elif weather == 'rain' and move['type'] == 'Fire':
-                other_modifiers *= 0.5
+        return {
+            'base_damage': base_damage,
+            'other_modifiers': other_modifiers,
+            'critical_multiplier': critical_multiplier,
+            'stab_multiplier': stab_multiplier,
+            'type_multiplier': type_multiplier,
+            'attacker_damage_multiplier': attacker_damage_multiplier,
+            'defender_damage_multiplier': defender_damage_multiplier,
+            'attack_stat': attack_stat,
+            'defense_stat': defense_stat
+        }
 
-            # 帮助类效果
-            if attacker.assist_status == 'help':
-                other_modifiers *= 1.5
+    def _finalize(self, attacker: Pokemon, defender: Pokemon, prepared: Dict[str, Union[int, float]],
+                  random_factor: float = None) -> Dict[str, Union[int, float]]:
+        """在预先计算好的倍率上应用随机因子，得到最终伤害及显示用的中间值"""
+        base_damage = prepared['base_damage']
+        other_modifiers = prepared['other_modifiers']
+        critical_multiplier = prepared['critical_multiplier']
+        stab_multiplier = prepared['stab_multiplier']
+        type_multiplier = prepared['type_multiplier']
+
+        # 第二步：乘以随机因子（如果未指定则随机生成）
+        if random_factor is None:
+            random_factor = _RANDOM_MIN + _RANDOM_SPAN * random.random()
+
+        # 为了保留中间显示信息，先计算浮点数各步骤（最终仍按指定规则取整）
+        float_step1 = other_modifiers * critical_multiplier               # 其他修正 * 要害
+        float_step2 = float_step1 * random_factor                         # * 随机数
+        float_step3 = float_step2 * stab_multiplier                       # * STAB
+        float_step4 = float_step3 * type_multiplier                       # * 属性相克
+
+        # 最终按规则向下取整一次（并保证至少为1；属性免疫时为 0）
+        final_modifier = _final_modifier(float_step4, type_multiplier)
+
+        # 将中间结果按显示需要处理（保留用于调试/显示）
+        step1_result = self._round_half_up(float_step1)   # 五舍六入显示的中间值
+        step2_result = self._round_half_up(float_step2)
+        step3_result = self._round_half_up(float_step3)
+        # step4 使用 final_modifier（已 floor）
+        # 最终伤害
+        final_damage = int(base_damage * final_modifier)
 
-            # 包含道具带来的伤害倍率
-            other_modifiers *= attacker_damage_multiplier
-            other_modifiers *= defender_damage_multiplier
-
-            # 初始暴击 & STAB 倍率
-            critical_multiplier = 2.0 if critical_hit else 1.0
-            stab_multiplier = 1.5 if move['type'] in attacker.types else 1.0
-
-            # 让特性修改 other_modifiers / STAB / 暴击倍率 / 属性相克倍率
-            other_modifiers, stab_multiplier, critical_multiplier, type_multiplier = \
-                self.apply_offensive_ability_effects(attacker, move, other_modifiers,
-                                                     stab_multiplier, critical_multiplier,
-                                                     type_multiplier, critical_hit)
-
-            other_modifiers, type_multiplier = self.apply_defensive_ability_effects(defender, move,
-                                                                                    other_modifiers,
-                                                                                    type_multiplier)
-
-            # 第一步：other_modifiers * 暴击 -> 五舍六入
-            step1_modifier = other_modifiers * critical_multiplier
-            step1_result = self._round_half_up(step1_modifier)
-
-            # 第二步：乘以随机因子（如果未指定则随机生成）
-            if random_factor is None:
-                random_factor = random.uniform(0.85, 1.0)
-
-            # 为了保留中间显示信息，先计算浮点数各步骤（最终仍按指定规则取整）
-            float_step1 = other_modifiers * critical_multiplier               # 其他修正 * 要害
-            float_step2 = float_step1 * random_factor                         # * 随机数
-            float_step3 = float_step2 * stab_multiplier                       # * STAB
-            float_step4 = float_step3 * type_multiplier                       # * 属性相克
-
-            # 最终按规则向下取整一次（并保证至少为1）
-            final_modifier = max(1, math.floor(float_step4))
-
-            # 将中间结果按显示需要处理（保留用于调试/显示）
-            step1_result = self._round_half_up(float_step1)   # 五舍六入显示的中间值
-            step2_result = self._round_half_up(float_step2)
-            step3_result = self._round_half_up(float_step3)
-            # step4 使用 final_modifier（已 floor）
-            # 最终伤害
-            final_damage = int(base_damage * final_modifier)
-
-            return {
-                'damage': final_damage,
-                'base_damage': base_damage,
-                'modifiers': {
-                    'other_modifiers': other_modifiers,
-                    'critical_multiplier': critical_multiplier,
-                    'random_factor': random_factor,
-                    'stab_multiplier': stab_multiplier,
-                    'type_multiplier': type_multiplier,
-                    'final_modifier': final_modifier,
-                    'attacker_item_multiplier': attacker_damage_multiplier,
-                    'defender_item_multiplier': defender_damage_multiplier
-                },
-                'calculation_steps': {
-                    'step1_other_critical': step1_result,
-                    'step2_random': step2_result,
-                    'step3_stab': step3_result,
-                    'step4_type': final_modifier
-                },
-                'stats_used': {
-                    'attack_stat': attack_stat,
-                    'defense_stat': defense_stat
-                },
-                'items_used': {
-                    'attacker_item': attacker.item if attacker.item else "无",
-                    'defender_item': defender.item if defender.item else "无"
-                }
+        return {
+            'damage': final_damage,
+            'base_damage': base_damage,
+            'modifiers': {
+                'other_modifiers': other_modifiers,
+                'critical_multiplier': critical_multiplier,
+                'random_factor': random_factor,
+                'stab_multiplier': stab_multiplier,
+                'type_multiplier': type_multiplier,
+                'final_modifier': final_modifier,
+                'attacker_item_multiplier': prepared['attacker_damage_multiplier'],
+                'defender_item_multiplier': prepared['defender_damage_multiplier']
+            },
+            'calculation_steps': {
+                'step1_other_critical': step1_result,
+                'step2_random': step2_result,
+                'step3_stab': step3_result,
+                'step4_type': final_modifier
+            },
+            'stats_used': {
+                'attack_stat': prepared['attack_stat'],
+                'defense_stat': prepared['defense_stat']
+            },
+            'items_used': {
+                'attacker_item': attacker.item if attacker.item else "无",
+                'defender_item': defender.item if defender.item else "无"
             }
-        except Exception as e:
-            return {'error': f'Calculation error: {str(e)}'}
+        }
 
     def calculate_damage(self, attacker: Pokemon, defender: Pokemon, move_id: int, 
                         critical_hit: bool = False, random_factor: float = None) -> Dict[str, Union[int, float]]:
@@ -525,16 +818,20 @@ class PokemonDamageCalculator:
     def calculate_damage_range(self, attacker: Pokemon, defender: Pokemon, move: Dict, 
                               critical_hit: bool = False) -> List[int]:
         """计算伤害区间"""
-        damage_range = []
+        # 与随机因子无关的部分只计算一次，16 档随机因子只重复最后的取整
+        try:
+            prepared = self._prepare_modifiers(attacker, defender, move, critical_hit)
+        except Exception:
+            return []
         
-        # 计算 16 个随机因子的伤害 (0.85 到 1.0)
-        for i in range(16):
-            random_factor = 0.85 + (i / 15) * 0.15
-            result = self.calculate_damage_direct(attacker, defender, move, critical_hit, random_factor)
-            if 'error' not in result:
-                damage_range.append(result['damage'])
+        base_damage = prepared['base_damage']
+        float_step1 = prepared['other_modifiers'] * prepared['critical_multiplier']
+        stab_multiplier = prepared['stab_multiplier']
+        type_multiplier = prepared['type_multiplier']
         
-        return damage_range
+        # 计算 16 个随机因子的伤害 (0.85 到 1.0)
+        return [base_damage * final_modifier
+                for final_modifier in _roll_modifiers(float_step1, stab_multiplier, type_multiplier)]
 
     def get_damage_statistics(self, attacker: Pokemon, defender: Pokemon, move: Dict, 
                              defender_max_hp: int = None) -> Dict:
@@ -561,19 +858,52 @@ class PokemonDamageCalculator:
             }
         }
     
+    def calculate_damage_matrix(self, attackers: List[Pokemon], defenders: List[Pokemon], moves: List[Dict],
+                                critical_hit: bool = False) -> List[List[List[List[int]]]]:
+        """
+        批量计算 攻击方 × 防守方 × 招式 的伤害区间（队伍对位表）。
+        返回 matrix[a][d][m]，即对应组合的 16 档伤害列表（计算出错时为空列表）。
+        每个组合只准备一次倍率，能力值在同一宝可梦的多次组合之间命中缓存。
+        """
+        return [[[self.calculate_damage_range(attacker, defender, move, critical_hit) for move in moves]
+                 for defender in defenders]
+                for attacker in attackers]
+    
+    def calculate_damage_batch(self, columns: Dict[str, List]) -> List[List[int]]:
+        """
+        按列批量计算已确定数值的伤害区间（结构化数组输入，适合配置扫描）。
+        columns 为 _BATCH_COLUMNS 中各键对应的等长列表，第 i 行即第 i 个组合；
+        不再逐项处理特性/道具等，倍率按原样使用。
+        返回每行对应的 16 档伤害列表；取整规则与 calculate_damage_range 相同（免疫时全部为 0）。
+        各列长度不一致时抛出 ValueError。
+        """
+        column_values = [columns[key] for key in _BATCH_COLUMNS]
+        lengths = {key: len(values) for key, values in zip(_BATCH_COLUMNS, column_values)}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f'calculate_damage_batch: column lengths differ: {lengths}')
+        rows = zip(*column_values)
+        results = []
+        for (level, power, attack_stat, defense_stat, other_modifiers,
+             critical_multiplier, stab_multiplier, type_multiplier) in rows:
+            base_damage = _base_damage(level, power or 0, attack_stat, defense_stat if defense_stat > 0 else 1)
+            results.append([base_damage * final_modifier
+                            for final_modifier in _roll_modifiers(other_modifiers * critical_multiplier,
+                                                                  stab_multiplier, type_multiplier)])
+        return results
+    
+    def calculate_damage_batch_rows(self, rows: List[Dict]) -> List[List[int]]:
+        """calculate_damage_batch 的按行接口：先将字典列表转换为按列存放，再批量计算"""
+        return self.calculate_damage_batch({key: [row[key] for row in rows] for key in _BATCH_COLUMNS})
+    
     def get_pokemon_by_name(self, name: str) -> Optional[Dict]:
         """按中文名字查找宝可梦"""
-        for pokemon_id, pokemon_data in self.pokemon_data.items():
-            if pokemon_data['name'] == name:
-                return {'id': pokemon_id, **pokemon_data}
-        return None
+        entry = self._name_index('pokemon', self.pokemon_data).get(name)
+        return {'id': entry[0], **entry[1]} if entry else None
     
     def get_move_by_name(self, name: str) -> Optional[Dict]:
         """按中文名字查找招式"""
-        for move_id, move_data in self.moves_data.items():
-            if move_data['name'] == name:
-                return {'id': move_id, **move_data}
-        return None
+        entry = self._name_index('move', self.moves_data).get(name)
+        return {'id': entry[0], **entry[1]} if entry else None
     
     def list_natures(self) -> List[Dict]:
         """列出所有性格及其修正"""
@@ -609,79 +939,29 @@ class PokemonDamageCalculator:
 
     def apply_attacker_item_effects(self, pokemon: Pokemon, stats: Dict[str, int], move_type: str, 
                                    type_multiplier: float) -> Dict[str, Union[int, float]]:
-        """将进攻方道具效果应用到数值和伤害"""
-        if not pokemon.item or pokemon.item not in self.attacker_items:
+        """
+        将进攻方道具效果应用到数值和伤害。
+        按道具 type 从 _ATTACKER_ITEM_HANDLERS 取处理函数；未修改能力值时原样返回 stats。
+        """
+        item_data = self.attacker_items.get(pokemon.item) if pokemon.item else None
+        handler = _ATTACKER_ITEM_HANDLERS.get(item_data['type']) if item_data else None
+        if handler is None:
             return {'stats': stats, 'damage_multiplier': 1.0}
         
-        item_data = self.attacker_items[pokemon.item]
-        modified_stats = stats.copy()
-        damage_multiplier = 1.0
-        
-        if item_data['type'] == 'attack_boost':
-            # 力量头戴、博识眼镜、讲究头戴、讲究眼镜
-            stat_name = item_data['stat']
-            if stat_name in modified_stats:
-                modified_stats[stat_name] = int(modified_stats[stat_name] * item_data['multiplier'])
-        
-        elif item_data['type'] == 'damage_boost':
-            # 属性宝石、属性石板、生命宝珠
-            damage_multiplier *= item_data['multiplier']
-        
-        elif item_data['type'] == 'special_pokemon':
-            # 电气球、粗骨头（指定宝可梦的特殊道具）
-            pokemon_name = pokemon.name
-            target_pokemon = item_data['pokemon']
-            
-            # 支持单个宝可梦或宝可梦列表
-            if isinstance(target_pokemon, list):
-                is_target = pokemon_name in target_pokemon
-            else:
-                is_target = pokemon_name == target_pokemon
-            
-            if is_target:
-                # 若指定 effect == "damage"，则对最终伤害倍率生效；否则按对指定数值进行倍率
-                if item_data.get('effect') == 'damage':
-                    damage_multiplier *= item_data['multiplier']
-                else:
-                    for stat_name in item_data.get('stats', []):
-                        if stat_name in modified_stats:
-                            modified_stats[stat_name] = int(modified_stats[stat_name] * item_data['multiplier'])
-        
-        elif item_data['type'] == 'type_advantage':
-            # 达人带：当对方属性为克制时生效
-            if type_multiplier > 1.0:
-                damage_multiplier *= item_data['multiplier']
-        
+        modified_stats, damage_multiplier = handler(self, pokemon, stats, item_data, type_multiplier)
         return {'stats': modified_stats, 'damage_multiplier': damage_multiplier}
     
     def apply_defender_item_effects(self, pokemon: Pokemon, stats: Dict[str, int]) -> Dict[str, Union[int, float]]:
-        """将防守方道具效果应用到数值和伤害"""
-        if not pokemon.item or pokemon.item not in self.defender_items:
+        """
+        将防守方道具效果应用到数值和伤害。
+        按道具 type 从 _DEFENDER_ITEM_HANDLERS 取处理函数；未修改能力值时原样返回 stats。
+        """
+        item_data = self.defender_items.get(pokemon.item) if pokemon.item else None
+        handler = _DEFENDER_ITEM_HANDLERS.get(item_data['type']) if item_data else None
+        if handler is None:
             return {'stats': stats, 'damage_multiplier': 1.0}
         
-        item_data = self.defender_items[pokemon.item]
-        modified_stats = stats.copy()
-        damage_multiplier = 1.0
-        
-        if item_data['type'] == 'damage_reduction':
-            # 弱化伤害果实
-            damage_multiplier *= item_data['multiplier']
-        
-        elif item_data['type'] == 'defense_boost':
-            # 突击背心
-            stat_name = item_data['stat']
-            if stat_name in modified_stats:
-                modified_stats[stat_name] = int(modified_stats[stat_name] * item_data['multiplier'])
-        
-        elif item_data['type'] == 'evolution_stone':
-            # 进化奇石 / Eviolite - 仅对非最终进化体生效
-            if pokemon.id in self.pokemon_data:
-                evolution_stage = self.pokemon_data[pokemon.id].get('evolution_stage', 'unknown')
-                if evolution_stage == 'not_final':
-                    for stat_name in item_data['stats']:
-                        if stat_name in modified_stats:
-                            modified_stats[stat_name] = int(modified_stats[stat_name] * item_data['multiplier'])
-        
+        modified_stats, damage_multiplier = handler(self, pokemon, stats, item_data)
         return {'stats': modified_stats, 'damage_multiplier': damage_multiplier}
 
     def apply_offensive_ability_effects(self, attacker: Pokemon, move: Dict,
@@ -711,7 +991,7 @@ class PokemonDamageCalculator:
                 critical_multiplier = 3.0
 
         if name == '无畏':
-            if type_multiplier == 0 and move['type'] in ['Normal', 'Fighting']:
+            if type_multiplier == 0 and move['type'] in _IMMUNITY_BYPASS_TYPES:
                 type_multiplier = 1.0
 
         # 猛火/激流 等 HP% 触发类（在此实现为只要选择就触发）
@@ -730,75 +1010,187 @@ class PokemonDamageCalculator:
         return other_modifiers, stab_multiplier, critical_multiplier, type_multiplier
 
 
-    def apply_defensive_ability_effects(self, defender: Pokemon, move: Dict,
+    def apply_defensive_ability_effects(self, defender: Pokemon, atk_type: str, category: str,
                                         other_modifiers: float, type_multiplier: float) -> Tuple[float, float]:
         """
         应用防守类特性对属性相克或其他修正的影响。
+        atk_type / category 为招式的属性与分类，由调用方预先取出。
         返回更新后的 (other_modifiers, type_multiplier)。
         """
         name = defender.ability
         if not name or name not in getattr(self, 'defensive_abilities', {}):
             return other_modifiers, type_multiplier
 
-        # 简单实现若干防守特性
-        atk_type = move['type']
-        if name == '厚脂肪':
-            if atk_type in ['Fire', 'Ice']:
-                type_multiplier *= 0.5
-
-        if name == '干燥皮肤':
-            if atk_type == 'Water':
-                # 干燥皮肤对水属性免疫
-                type_multiplier = 0.0
-            elif atk_type == 'Fire':
-                other_modifiers *= 1.25  # 受到火攻击伤害增加
-
-        if name == '过滤':
-            # 过滤：受克制时伤害 ×0.75
-            if type_multiplier > 1.0:
-                type_multiplier *= 0.75
-
-        if name in ('避雷针', '蓄电'):
-            if atk_type == 'Electric':
-                type_multiplier = 0.0
-
-        if name == '引水':
-            if atk_type == 'Water':
-                type_multiplier = 0.0
-
-        if name == '火焰吸收':
-            if atk_type == 'Fire':
-                type_multiplier = 0.0
-
-        if name == '漂浮':
-            if atk_type == 'Ground':
-                type_multiplier = 0.0
-
-        if name == '轻装':
-            # 轻装：受到物理攻击伤害减半
-            if move.get('category') == '物理':
-                other_modifiers *= 0.5
-
-        # 多重鳞片等需要检测是否为满血，这里暂不自动触发
+        # 已经是 0 倍（属性免疫）时，防守特性不再有任何意义
+        if type_multiplier == 0.0:
+            return other_modifiers, type_multiplier
+
+        # 按 (特性名, 招式属性/分类) 查表取倍率，未登记的组合为 1 倍；
+        # 多重鳞片等需要检测是否为满血的特性不在表中，这里暂不自动触发
+        type_multiplier *= _DEFENSIVE_TYPE_MULTIPLIERS.get((name, atk_type), 1.0)
+        other_modifiers *= _DEFENSIVE_OTHER_MULTIPLIERS.get((name, atk_type), 1.0)
+        other_modifiers *= _DEFENSIVE_CATEGORY_MULTIPLIERS.get((name, category), 1.0)
+
+        # 过滤等：仅在效果绝佳时生效，依赖当前倍率，单独判断
+        reduction = _SUPER_EFFECTIVE_REDUCTIONS.get(name)
+        if reduction is not None and type_multiplier > 1.0:
+            type_multiplier *= reduction
         return other_modifiers, type_multiplier
 
 
+# ------ 防守特性倍率表 ------
+# 表中的中文特性名均已驻留（见 Pokemon.__post_init__）
+
+# (特性名, 招式属性) -> 属性相克倍率；吸收/免疫类特性为 0 倍
+_DEFENSIVE_TYPE_MULTIPLIERS = {
+    (sys.intern('干燥皮肤'), 'Water'): 0.0,
+    (sys.intern('避雷针'), 'Electric'): 0.0,
+    (sys.intern('蓄电'), 'Electric'): 0.0,
+    (sys.intern('引水'), 'Water'): 0.0,
+    (sys.intern('火焰吸收'), 'Fire'): 0.0,
+    (sys.intern('漂浮'), 'Ground'): 0.0,
+    # 厚脂肪：火/冰属性招式伤害减半
+    (sys.intern('厚脂肪'), 'Fire'): 0.5,
+    (sys.intern('厚脂肪'), 'Ice'): 0.5,
+}
+
+# (特性名, 招式属性) -> 其他修正倍率
+_DEFENSIVE_OTHER_MULTIPLIERS = {
+    # 干燥皮肤：受到火攻击伤害增加
+    (sys.intern('干燥皮肤'), 'Fire'): 1.25,
+}
+
+# (特性名, 招式分类) -> 其他修正倍率
+_DEFENSIVE_CATEGORY_MULTIPLIERS = {
+    # 轻装：受到物理攻击伤害减半
+    (sys.intern('轻装'), '物理'): 0.5,
+}
+
+# 特性名 -> 受克制（倍率 > 1）时的属性相克倍率修正
+_SUPER_EFFECTIVE_REDUCTIONS = {
+    sys.intern('过滤'): 0.75,
+}
+
+
+# ------ 道具效果处理函数（按道具 type 分派） ------
+# 进攻方: (calculator, pokemon, stats, item_data, type_multiplier) -> (stats, damage_multiplier)
+# 防守方: (calculator, pokemon, stats, item_data) -> (stats, damage_multiplier)
+
+def _item_attack_boost(calculator, pokemon, stats, item_data, type_multiplier):
+    """力量头戴、博识眼镜、讲究头戴、讲究眼镜"""
+    return _scale_stats(stats, (item_data['stat'],), item_data['multiplier']), 1.0
+
+
+def _item_damage_boost(calculator, pokemon, stats, item_data, type_multiplier):
+    """属性宝石、属性石板、生命宝珠"""
+    return stats, float(item_data['multiplier'])
+
+
+def _item_special_pokemon(calculator, pokemon, stats, item_data, type_multiplier):
+    """电气球、粗骨头（指定宝可梦的特殊道具）"""
+    target_pokemon = item_data['pokemon']
+    
+    # 支持单个宝可梦或宝可梦列表
+    if isinstance(target_pokemon, list):
+        is_target = pokemon.name in target_pokemon
+    else:
+        is_target = pokemon.name == target_pokemon
+    
+    if not is_target:
+        return stats, 1.0
+    # 若指定 effect == "damage"，则对最终伤害倍率生效；否则按对指定数值进行倍率
+    if item_data.get('effect') == 'damage':
+        return stats, float(item_data['multiplier'])
+    return _scale_stats(stats, item_data.get('stats', []), item_data['multiplier']), 1.0
+
+
+def _item_type_advantage(calculator, pokemon, stats, item_data, type_multiplier):
+    """达人带：当对方属性为克制时生效"""
+    return stats, float(item_data['multiplier']) if type_multiplier > 1.0 else 1.0
+
+
+def _item_damage_reduction(calculator, pokemon, stats, item_data):
+    """弱化伤害果实"""
+    return stats, float(item_data['multiplier'])
+
+
+def _item_defense_boost(calculator, pokemon, stats, item_data):
+    """突击背心"""
+    return _scale_stats(stats, (item_data['stat'],), item_data['multiplier']), 1.0
+
+
+def _item_evolution_stone(calculator, pokemon, stats, item_data):
+    """进化奇石 / Eviolite - 仅对非最终进化体生效"""
+    pokemon_data = calculator.pokemon_data.get(pokemon.id)
+    if pokemon_data is not None and pokemon_data.get('evolution_stage', 'unknown') == 'not_final':
+        return _scale_stats(stats, item_data['stats'], item_data['multiplier']), 1.0
+    return stats, 1.0
+
+
+_ATTACKER_ITEM_HANDLERS = {
+    'attack_boost': _item_attack_boost,
+    'damage_boost': _item_damage_boost,
+    'special_pokemon': _item_special_pokemon,
+    'type_advantage': _item_type_advantage,
+}
+
+_DEFENDER_ITEM_HANDLERS = {
+    'damage_reduction': _item_damage_reduction,
+    'defense_boost': _item_defense_boost,
+    'evolution_stone': _item_evolution_stone,
+}
+
+
+def _json_loads(data: bytes):
+    """解析 JSON 字节串（优先使用 orjson，可直接解析 UTF-8 字节）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """序列化为 2 空格缩进、保留非 ASCII 字符的 UTF-8 JSON 字节串（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _read_json_input(input_file=None) -> bytes:
+    """读取原始 JSON 字节，去除首尾空白与 UTF-8 BOM"""
+    if input_file:
+        with open(input_file, 'rb') as f:
+            input_data = f.read()
+    elif hasattr(sys.stdin, 'buffer'):
+        input_data = sys.stdin.buffer.read()
+    else:
+        input_data = sys.stdin.read().encode('utf-8')
+    
+    input_data = input_data.strip()
+    if input_data.startswith(b'\xef\xbb\xbf'):
+        input_data = input_data[3:]
+    return input_data
+
+
+def _write_json_output(obj):
+    """将结果以 UTF-8 字节直接写入标准输出，不经过文本层的编码转换"""
+    data = _json_dumps(obj) + b'\n'
+    if hasattr(sys.stdout, 'buffer'):
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    else:
+        sys.stdout.write(data.decode('utf-8'))
+
+
+# main() 是否已将 sys.stdout 包装为 UTF-8 输出
+_stdout_wrapped = False
+
+
 def run_json_mode(input_file=None):
     """JSON 接口模式 - 从标准输入或文件读取 JSON 参数"""
     try:
-        if input_file:
-            # 从文件读取 JSON
-            with open(input_file, 'r', encoding='utf-8') as f:
-                input_data = f.read()
-        else:
-            # 从标准输入读取 JSON，指定编码
-            input_data = sys.stdin.read()
-        
-        # 去除可能的 BOM 和空白字符
-        input_data = input_data.strip()
-        if input_data.startswith('\ufeff'):
-            input_data = input_data[1:]
-        json_data = json.loads(input_data)
+        # 以字节读取 JSON（文件或标准输入），交给解析器直接处理 UTF-8
+        json_data = _json_loads(_read_json_input(input_file))
         
         # 创建计算器（不加载数据文件，因为数据通过 JSON 传入）
         calculator = PokemonDamageCalculator(load_data_files=False)
@@ -807,15 +1199,16 @@ def run_json_mode(input_file=None):
         result = calculator.calculate_damage_from_json(json_data)
         
         # 输出 JSON 结果
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        _write_json_output(result)
         
     except json.JSONDecodeError as e:
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，两种解析器都在此处理
         error_result = {'error': f'Invalid JSON input: {str(e)}'}
-        print(json.dumps(error_result, ensure_ascii=False, indent=2))
+        _write_json_output(error_result)
         sys.exit(1)
     except Exception as e:
         error_result = {'error': f'Calculation failed: {str(e)}'}
-        print(json.dumps(error_result, ensure_ascii=False, indent=2))
+        _write_json_output(error_result)
         sys.exit(1)
 
 
@@ -832,13 +1225,16 @@ def main():
         return
     
     # 为 Windows 控制台设置 UTF-8 编码（安全处理，若不可用则忽略）
-    import io
-    try:
-        if hasattr(sys.stdout, "buffer"):
-            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    except Exception:
-        # 若包装失败（例如在调试器下），保持原样
-        pass
+    # 只包装一次：重复调用 main() 时不再层层套上新的 TextIOWrapper
+    global _stdout_wrapped
+    if not _stdout_wrapped:
+        try:
+            if hasattr(sys.stdout, "buffer"):
+                sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+                _stdout_wrapped = True
+        except Exception:
+            # 若包装失败（例如在调试器下），保持原样
+            pass
     
     # 初始化计算器
     calculator = PokemonDamageCalculator()
@@ -929,14 +1325,17 @@ def main():
     result = calculator.calculate_damage(attacker, defender, move_id, critical_hit, random_factor)
     
     # ------ 更详细的输出（显示倍数、伤害区间、占比等） ------
-    attacker_stats = calculator.calculate_stats(attacker)
+    # 攻击方能力值在设置 current_hp 时已经算过，直接复用
+    attacker_stats = attacker_max_stats
     defender_stats = calculator.calculate_stats(defender)
     defender_hp = defender_stats.get('HP', 1)
     
-    print()
-    print(f"  Attacker / 进攻方: Attack(物攻) = {attacker_stats.get('Attack', 0)}  |  Sp. Attack(特攻) = {attacker_stats.get('Sp. Attack', 0)}")
-    print(f"  Defender / 防守方: Defense(物防) = {defender_stats.get('Defense', 0)}  |  Sp. Defense(特防) = {defender_stats.get('Sp. Defense', 0)}  |  HP = {defender_hp}")
-    print()
+    # 输出先收集到 lines 中，最后一次性写出
+    lines = []
+    lines.append("")
+    lines.append(f"  Attacker / 进攻方: Attack(物攻) = {attacker_stats.get('Attack', 0)}  |  Sp. Attack(特攻) = {attacker_stats.get('Sp. Attack', 0)}")
+    lines.append(f"  Defender / 防守方: Defense(物防) = {defender_stats.get('Defense', 0)}  |  Sp. Defense(特防) = {defender_stats.get('Sp. Defense', 0)}  |  HP = {defender_hp}")
+    lines.append("")
 
     def _fmt_field(val: str) -> str:
         if not val:
@@ -953,79 +1352,66 @@ def main():
     def_item_mult = result['modifiers'].get('defender_item_multiplier', 1.0)
 
     # 输出头信息
-    print("=== Pokemon Damage Calculator / 宝可梦伤害计算器 ===")
-    print(f"Attacker: {attacker.name} (Lv.{attacker.level})  Item:{_fmt_field(attacker.item)}  Ability:{_fmt_field(attacker.ability)}")
-    print(f"Defender: {defender.name} (Lv.{defender.level})  Item:{_fmt_field(defender.item)}  Ability:{_fmt_field(defender.ability)}")
-    print(f"Move: {move_data['name']}  Power: {move_data['power']}  Type: {move_data['type']}")
-    print()
+    lines.append("=== Pokemon Damage Calculator / 宝可梦伤害计算器 ===")
+    lines.append(f"Attacker: {attacker.name} (Lv.{attacker.level})  Item:{_fmt_field(attacker.item)}  Ability:{_fmt_field(attacker.ability)}")
+    lines.append(f"Defender: {defender.name} (Lv.{defender.level})  Item:{_fmt_field(defender.item)}  Ability:{_fmt_field(defender.ability)}")
+    lines.append(f"Move: {move_data['name']}  Power: {move_data['power']}  Type: {move_data['type']}")
+    lines.append("")
     
     # 显示天气与墙壁
-    print(f"Weather / 天气: Attacker: {_fmt_field(attacker.weather)}  Defender: {_fmt_field(defender.weather)}")
+    lines.append(f"Weather / 天气: Attacker: {_fmt_field(attacker.weather)}  Defender: {_fmt_field(defender.weather)}")
     atk_screens = ', '.join(attacker.screens) if attacker.screens else '无'
     def_screens = ', '.join(defender.screens) if defender.screens else '无'
-    print(f"Screens / 墙壁: Attacker: {atk_screens}  Defender: {def_screens}")
-    print()
+    lines.append(f"Screens / 墙壁: Attacker: {atk_screens}  Defender: {def_screens}")
+    lines.append("")
 
     # 显示倍数明细
-    print("Multipliers / 倍率明细:")
-    print(f"  Attribute effectiveness (属性相克): x{type_eff:.2f}")
-    print(f"  Other modifiers (包含天气/道具/状态等): x{other_mod:.3f}")
-    print(f"  STAB (属性一致加成): x{stab:.2f}")
-    print(f"  Items (attacker x defender): x{atk_item_mult:.2f} x{def_item_mult:.2f}")
-    print()
-
-    # 基于离散随机 0.85..1.00 计算伤害区间
-    random_values = [i / 100.0 for i in range(85, 101)]
-    damages_no_crit = []
-    damages_crit_1_5 = []  # 暴击显示为 1.5x
-    for rv in random_values:
-        # 非暴击
-        float_final = other_mod * 1.0 * rv * stab * type_eff
-        final_mod = max(1, math.floor(float_final))
-        damages_no_crit.append(base_damage * final_mod)
-        # 暴击（1.5）
-        float_final_crit = other_mod * 1.5 * rv * stab * type_eff
-        final_mod_crit = max(1, math.floor(float_final_crit))
-        damages_crit_1_5.append(base_damage * final_mod_crit)
-
-    dmg_min = min(damages_no_crit)
-    dmg_max = max(damages_no_crit)
-    dmg_min_crit = min(damages_crit_1_5)
-    dmg_max_crit = max(damages_crit_1_5)
+    lines.append("Multipliers / 倍率明细:")
+    lines.append(f"  Attribute effectiveness (属性相克): x{type_eff:.2f}")
+    lines.append(f"  Other modifiers (包含天气/道具/状态等): x{other_mod:.3f}")
+    lines.append(f"  STAB (属性一致加成): x{stab:.2f}")
+    lines.append(f"  Items (attacker x defender): x{atk_item_mult:.2f} x{def_item_mult:.2f}")
+    lines.append("")
+
+    # 基于离散随机 0.85..1.00 计算伤害区间与一击必杀档数（暴击显示为 1.5x）
+    random_values = _DISPLAY_RANDOM_FACTORS
+    (dmg_min, dmg_max, dmg_min_crit, dmg_max_crit,
+     hits_no_crit, hits_crit_1_5) = _damage_summary(base_damage, other_mod, stab, type_eff,
+                                                     defender_hp, random_values)
 
     pct_min = dmg_min / defender_hp * 100
     pct_max = dmg_max / defender_hp * 100
     pct_min_crit = dmg_min_crit / defender_hp * 100
     pct_max_crit = dmg_max_crit / defender_hp * 100
 
-    print("Damage Ranges / 伤害区间 (基于随机 0.85~1.00):")
-    print(f"  Non-crit (非暴击): {dmg_min} - {dmg_max}   ({pct_min:.1f}% - {pct_max:.1f}% of target HP)")
-    print(f"  Crit @1.5x (要害显示为 x1.5): {dmg_min_crit} - {dmg_max_crit}   ({pct_min_crit:.1f}% - {pct_max_crit:.1f}% of target HP)")
-    print()
+    lines.append("Damage Ranges / 伤害区间 (基于随机 0.85~1.00):")
+    lines.append(f"  Non-crit (非暴击): {dmg_min} - {dmg_max}   ({pct_min:.1f}% - {pct_max:.1f}% of target HP)")
+    lines.append(f"  Crit @1.5x (要害显示为 x1.5): {dmg_min_crit} - {dmg_max_crit}   ({pct_min_crit:.1f}% - {pct_max_crit:.1f}% of target HP)")
+    lines.append("")
 
     # 一击必杀概率（离散16档随机）
-    hits_no_crit = sum(1 for d in damages_no_crit if d >= defender_hp)
-    hits_crit_1_5 = sum(1 for d in damages_crit_1_5 if d >= defender_hp)
     prob_no_crit = hits_no_crit / len(random_values)
     prob_crit_1_5 = hits_crit_1_5 / len(random_values)
-    print("OHKO Probabilities (离散16档随机 0.85..1.00):")
-    print(f"  Without crit: {prob_no_crit*100:.1f}%  ({hits_no_crit}/{len(random_values)})")
-    print(f"  Crit (shown as x1.5): {prob_crit_1_5*100:.1f}%  ({hits_crit_1_5}/{len(random_values)})")
-    print()
+    lines.append("OHKO Probabilities (离散16档随机 0.85..1.00):")
+    lines.append(f"  Without crit: {prob_no_crit*100:.1f}%  ({hits_no_crit}/{len(random_values)})")
+    lines.append(f"  Crit (shown as x1.5): {prob_crit_1_5*100:.1f}%  ({hits_crit_1_5}/{len(random_values)})")
+    lines.append("")
 
     # 使用当前运行的随机因子展示中间步骤数值
     used_rand = result['modifiers']['random_factor']
     float_no_crit_used = other_mod * 1.0 * used_rand * stab * type_eff
     float_crit_used = other_mod * 1.5 * used_rand * stab * type_eff
-    print("Example (using current run's random factor):")
-    print(f"  Random factor used: {used_rand:.3f}")
-    print(f"  Float final multiplier (non-crit): {float_no_crit_used:.3f} -> int final modifier: {max(1, math.floor(float_no_crit_used))}")
-    print(f"  Float final multiplier (crit x1.5): {float_crit_used:.3f} -> int final modifier: {max(1, math.floor(float_crit_used))}")
-    print()
-
-    print(f"Base damage (before multipliers): {base_damage}")
-    print(f"Final damage (example run): {result['damage']}")
-    print()
+    lines.append("Example (using current run's random factor):")
+    lines.append(f"  Random factor used: {used_rand:.3f}")
+    lines.append(f"  Float final multiplier (non-crit): {float_no_crit_used:.3f} -> int final modifier: {_final_modifier(float_no_crit_used, type_eff)}")
+    lines.append(f"  Float final multiplier (crit x1.5): {float_crit_used:.3f} -> int final modifier: {_final_modifier(float_crit_used, type_eff)}")
+    lines.append("")
+
+    lines.append(f"Base damage (before multipliers): {base_damage}")
+    lines.append(f"Final damage (example run): {result['damage']}")
+    lines.append("")
+
+    sys.stdout.write('\n'.join(lines) + '\n')
 # 确保作为脚本执行时运行 main()
 if __name__ == '__main__':
     main()
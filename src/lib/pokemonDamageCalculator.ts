@@ -938,8 +938,8 @@ export class PokemonDamageCalculator {
     const floatStep3 = floatStep2 * stabMultiplier;             // * STAB
     const floatStep4 = floatStep3 * typeMultiplier;             // * 属性相克
 
-    // 最终修正因子（向下取整，最小值为1）
-    const finalModifier = Math.max(1, Math.floor(floatStep4));
+    // 最终修正因子（向下取整，最小值为1；属性免疫即最终相克倍率为 0 时为 0，伤害为 0）
+    const finalModifier = typeMultiplier === 0 ? 0 : Math.max(1, Math.floor(floatStep4));
 
     // 显示用的中间结果（五舍六入）
     const step1Result = roundHalfUp(floatStep1);